@@ -3,11 +3,11 @@
 import streamlit as st
 import requests
 import json
-import re
 import urllib.parse
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 import uuid
+from text_normalizer import iter_normalized
 
 # ------------------------------
 # 페이지 설정
@@ -55,9 +55,6 @@ CLOVA_API_KEY = "nv-5e40cb6c29fc4a809841fab999de0e3dbe4f"
 # ------------------------------
 # 뉴스 수집 및 필터링
 # ------------------------------
-def clean_text(text):
-    return re.sub(r"<[^>]+>|&[^;\s]+;", "", text)
-
 def get_news(query):
     url = "https://openapi.naver.com/v1/search/news.json"
     headers = {"X-Naver-Client-Id": CLIENT_ID, "X-Naver-Client-Secret": CLIENT_SECRET}
@@ -90,11 +87,11 @@ def is_relevant_news(item, keywords):
 def crawl_news(queries, keywords):
     results = []
     for q in queries:
-        for item in filter_recent_news(get_news(q)):
+        for item in iter_normalized(filter_recent_news(get_news(q))):
             if is_relevant_news(item, keywords):
                 results.append({
-                    "title": clean_text(item["title"]),
-                    "description": clean_text(item["description"]),
+                    "title": item["title"],
+                    "description": item["description"],
                     "pubDate": item["pubDate"],
                     "link": item["link"],
                     "query": q
@@ -2,11 +2,11 @@
 import streamlit as st
 import requests
 import json
-import re
 import urllib.parse
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 import uuid
+from text_normalizer import iter_normalized
 
 # ------------------------------
 # API KEY 설정
@@ -61,9 +61,6 @@ selected_keywords = st.multiselect("키워드 선택 (최대 3개)", default_key
 # ------------------------------
 # 뉴스 수집 및 정제
 # ------------------------------
-def clean_text(text):
-    return re.sub(r"<[^>]+>|&[^;\s]+;", "", text)
-
 def get_news(query):
     url = "https://openapi.naver.com/v1/search/news.json"
     headers = {"X-Naver-Client-Id": CLIENT_ID, "X-Naver-Client-Secret": CLIENT_SECRET}
@@ -85,11 +82,11 @@ def is_relevant_news(item, keywords):
 def crawl_news(queries, keywords):
     results = []
     for q in queries:
-        for item in filter_recent_news(get_news(q), days=2):
+        for item in iter_normalized(filter_recent_news(get_news(q), days=2)):
             if is_relevant_news(item, keywords):
                 results.append({
-                    "title": clean_text(item["title"]),
-                    "description": clean_text(item["description"]),
+                    "title": item["title"],
+                    "description": item["description"],
                     "pubDate": item["pubDate"],
                     "link": item["link"],
                     "query": q
@@ -0,0 +1,267 @@
+# degradation.py
+import hashlib
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from hyperclova_api import classify_content, summarize_text, chat_completion, truncate_summary, CHAT_TIMEOUT
+from recommender import PRODUCTS_DB, INTEREST_OPTIONS
+from shared_state import get_backend
+from text_normalizer import normalize_text
+
+# ─── 서비스 모드 ─────────────────────────────────────────────
+# full     : LLM 요약 + LLM 테마 분류 + LLM 챗봇
+# cached   : 캐시된 요약·테마(없으면 잘라내기·키워드) + 챗봇 간단 답변
+# truncate : 잘라내기 요약 + 키워드 테마 + 챗봇 간단 답변
+MODES = ["full", "cached", "truncate"]
+
+# 요청 종류별로 LLM 응답을 기다리는 최대 시간(초).
+# 챗봇은 API 자체 타임아웃보다 짧게 잡으면 정상 응답도 버려지므로 그보다 길게 둔다.
+DEFAULT_DEADLINES = {"summary": 3.0, "themes": 3.0, "chat": CHAT_TIMEOUT + 1.0}
+
+# ─── 키워드 인덱스 (LLM 테마 분류 대체) ──────────────────────
+def build_keyword_index(products=PRODUCTS_DB, extra=INTEREST_OPTIONS):
+    keywords = set(extra)
+    for p in products:
+        keywords.update(p["themes"])
+    # 긴 키워드 우선 매칭
+    return re.compile("|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)))
+
+KEYWORD_INDEX = build_keyword_index()
+
+def keyword_themes(text, index=KEYWORD_INDEX):
+    return sorted(set(index.findall(text)))
+
+# ─── LLM 결과 캐시 ───────────────────────────────────────────
+def cache_key(kind, text, *params):
+    """
+    LLM 결과 캐시 키. 정규화한 본문 기준이라 공백·HTML 엔티티만 다른 같은 기사는 같은 키가 된다.
+    """
+    raw = "\x00".join([normalize_text(text)] + [str(x) for x in params])
+    return f"llm:{kind}:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+class LocalCache:
+    """
+    공유 저장소 없이 쓸 때의 프로세스 로컬 LRU. StateBackend 의 get/set 만 흉내 낸다.
+    """
+
+    def __init__(self, max_items=1024):
+        self.max_items = max_items
+        self._lock  = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+# ─── LLM 실패 응답 판별 ──────────────────────────────────────
+# hyperclova_api 는 호출 실패를 예외 대신 표시 문자열로 돌려주는 경우가 있다
+def summary_failed(summary):
+    return not isinstance(summary, str) or summary.startswith("❌")
+
+def themes_failed(result):
+    return not isinstance(result, dict)
+
+def chat_failed(answer):
+    return not isinstance(answer, str) or answer.startswith("[Error]")
+
+# ─── 부하 감시 & 모드 전환 ───────────────────────────────────
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class DegradationController:
+    """
+    LLM 호출 지연시간과 대기 중인 LLM 호출 수(큐 깊이)를 보고 서비스 모드를 단계적으로 낮추거나 올린다.
+
+    - LLM 호출은 전용 스레드 풀에서 돌리고 요청 종류별 deadline 까지만 기다린다. 늦으면 대체 로직으로 응답한다.
+    - 저하 모드에서는 probe_interval 마다 백그라운드로 LLM 을 한 번 호출해 회복 여부만 확인한다.
+    - 성공한 요약·테마 결과는 store(StateBackend) 에 정규화 본문 기준으로 저장해 모든 워커가 함께 쓴다.
+      full/cached 모드에서는 캐시에 있으면 LLM 을 부르지 않는다. store 가 없으면 프로세스 로컬 LRU 를 쓴다.
+    - LLM 이 예외를 던지거나 실패 표시 문자열을 돌려주면 대체 로직으로 응답하고,
+      그 호출은 느린 호출로 간주해 모드 하향 판단에 반영한다.
+    - summarize / themes / chat 호출 한 번마다 (종류, 당시 모드, 실제 사용한 방식)을 served 에 최근 것만 남기고,
+      전체 누적 건수는 mode_counts / via_counts 에 집계한다. 페이지 요청 단위가 아니라 호출 단위이므로
+      기사 N 건을 보여주는 페이지 한 번은 요약 N 건 + 테마 N 건으로 집계된다.
+    """
+
+    def __init__(self, deadlines=None, high_latency=2.0, low_latency=0.5, max_pending=8,
+                 window=50, recover_samples=3, cooldown=5.0, probe_interval=2.0, llm_workers=8,
+                 store=None, max_cached=1024, clock=time.monotonic):
+        self.deadlines       = dict(DEFAULT_DEADLINES, **(deadlines or {}))
+        self.store           = store if store is not None else LocalCache(max_cached)
+        self.high_latency    = high_latency
+        self.low_latency     = low_latency
+        self.max_pending     = max_pending
+        self.recover_samples = recover_samples
+        self.cooldown        = cooldown
+        self.probe_interval  = probe_interval
+        self.clock           = clock
+
+        self._executor   = ThreadPoolExecutor(max_workers=llm_workers)
+        self._lock       = threading.Lock()
+        self._latencies  = deque(maxlen=window)
+        self._level      = 0
+        self._pending    = 0
+        self._changed_at = clock()
+        self._probed_at  = clock()
+        self.served      = deque(maxlen=1000)  # 최근 (요청 종류, 모드, 사용 방식)
+        self.mode_counts = Counter()
+        self.via_counts  = Counter()
+
+    @property
+    def mode(self):
+        return MODES[self._level]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "pending": self._pending,
+                "p95_latency": _percentile(list(self._latencies), 0.95),
+                "mode_counts": dict(self.mode_counts),
+                "via_counts": dict(self.via_counts),
+            }
+
+    def _record(self, kind, mode, via):
+        with self._lock:
+            self.served.append((kind, mode, via))
+            self.mode_counts[mode] += 1
+            self.via_counts[via] += 1
+
+    def _reevaluate(self):
+        # _lock 을 잡은 상태에서 호출
+        now = self.clock()
+        if now - self._changed_at < self.cooldown:
+            return
+        p95 = _percentile(list(self._latencies), 0.95)
+        if (p95 > self.high_latency or self._pending > self.max_pending) \
+                and self._level < len(MODES) - 1:
+            self._level += 1
+        elif self._level > 0 and self._recovered() and self._pending <= self.max_pending // 2:
+            self._level -= 1
+        else:
+            return
+        self._changed_at = now
+        self._latencies.clear()
+
+    def _recovered(self):
+        # 저하 모드에서는 프로브 표본이 드물어서 p95 대신 최근 표본이 모두 빠른지로 판단한다
+        recent = list(self._latencies)[-self.recover_samples:]
+        return len(recent) == self.recover_samples and max(recent) < self.low_latency
+
+    def _cached(self, key):
+        # truncate 모드에서는 저장소 조회도 건너뛴다
+        return self.store.get(key) if self.mode != "truncate" else None
+
+    def _failure_latency(self, kind):
+        # 실패한 호출은 deadline 을 꽉 채운 느린 호출과 같게 친다 (항상 high_latency 보다 크게)
+        return max(self.deadlines[kind], 2 * self.high_latency)
+
+    def _call_llm(self, kind, call, on_result=None, failed=None):
+        """
+        현재 모드에 따라 LLM 을 호출한다. (결과 또는 None, 모드) 를 돌려주며,
+        None 이면 호출자가 대체 로직으로 응답한다.
+        예외를 던지거나 failed(결과) 가 참인 호출도 None 을 돌려주고 느린 표본으로 기록한다.
+        """
+        with self._lock:
+            self._reevaluate()
+            mode, now = self.mode, self.clock()
+            probe = self._level > 0
+            if probe:
+                if now - self._probed_at < self.probe_interval:
+                    return None, mode
+                self._probed_at = now
+            self._pending += 1
+
+        start = self.clock()
+
+        def done(future):
+            ok = not future.cancelled() and future.exception() is None \
+                and not (failed and failed(future.result()))
+            with self._lock:
+                self._pending -= 1
+                if not future.cancelled():
+                    elapsed = self.clock() - start
+                    self._latencies.append(elapsed if ok else max(elapsed, self._failure_latency(kind)))
+                self._reevaluate()
+            if ok and on_result:
+                on_result(future.result())
+
+        future = self._executor.submit(call)
+        future.add_done_callback(done)
+        if probe:
+            # 회복 확인용 호출: 사용자는 기다리지 않는다
+            return None, mode
+        try:
+            result = future.result(timeout=self.deadlines[kind])
+        except FuturesTimeout:
+            # 아직 풀에서 대기 중이면 취소해서 늦은 호출이 쌓이지 않게 한다
+            future.cancel()
+            return None, mode
+        except Exception:
+            # API 키 누락, 네트워크 오류 등: 완료 콜백이 실패 표본으로 기록한다
+            return None, mode
+        if failed and failed(result):
+            return None, mode
+        return result, mode
+
+    def summarize(self, text, max_length=200, llm=summarize_text):
+        key = cache_key("summary", text, max_length)
+        cached = self._cached(key)
+        if cached is not None:
+            self._record("summary", self.mode, "cache")
+            return cached
+        summary, mode = self._call_llm("summary", lambda: llm(text, max_length),
+                                       on_result=lambda s: self.store.set(key, s), failed=summary_failed)
+        if summary is not None:
+            self._record("summary", mode, "llm")
+            return summary
+        self._record("summary", mode, "truncate")
+        return truncate_summary(text, max_length)
+
+    def themes(self, text, llm=classify_content):
+        key = cache_key("themes", text)
+        cached = self._cached(key)
+        if cached is not None:
+            self._record("themes", self.mode, "cache")
+            return cached
+        result, mode = self._call_llm("themes", lambda: llm(text), failed=themes_failed,
+                                      on_result=lambda r: self.store.set(key, r.get("themes", [])))
+        if result is not None:
+            self._record("themes", mode, "llm")
+            return result.get("themes", [])
+        self._record("themes", mode, "keyword")
+        return keyword_themes(text)
+
+    def chat(self, prompt, fallback, llm=chat_completion):
+        """
+        LLM 이 늦거나 실패했거나 저하 모드이면 fallback(사전 계산된 추천 근거 등) 문자열로 답한다.
+        """
+        answer, mode = self._call_llm("chat", lambda: llm(prompt), failed=chat_failed)
+        if answer is not None:
+            self._record("chat", mode, "llm")
+            return answer
+        self._record("chat", mode, "canned")
+        return "현재 요청이 많아 간단한 답변을 드립니다.\n" + fallback
+
+# 프로세스 전역 컨트롤러 (앱에서 공유). 요약·테마 캐시는 워커 간 공유 저장소에 둔다
+controller = DegradationController(store=get_backend())
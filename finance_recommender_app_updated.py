@@ -1,13 +1,22 @@
-import os, json, hashlib, requests
+import os, hashlib, requests, time
 from datetime import datetime
 from collections import Counter
 import streamlit as st
-from hyperclova_api import classify_content, summarize_text, chat_completion
+from text_normalizer import iter_normalized, normalize_item
+from degradation import controller
+from shared_state import get_backend, leader, lease_owner, wait_for_leader, import_legacy_news, SharedCache
+from recommender import classify_investor, generate_investor_profile, recommendation_table, format_breakdown
 
 # ─── 설정 ─────────────────────────────────────────────────
 CLIENT_ID     = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
-NEWS_DB_PATH  = "news_data.json"
+NEWS_DB_PATH  = "news_data.json"                     # 예전 단일 파일 저장소 (최초 1회 가져오기)
+CRAWL_TTL     = int(os.getenv("CRAWL_TTL", "300"))  # 같은 키워드 재크롤링 간격(초)
+CRAWL_WAIT    = float(os.getenv("CRAWL_WAIT", "3")) # 다른 워커의 크롤링 결과를 기다리는 최대 시간(초)
+
+# 워커 간 공유 상태 (STATE_BACKEND / STATE_PATH 환경변수로 선택)
+state      = get_backend()
+news_cache = SharedCache(state)
 
 # ─── 유틸 함수 ───────────────────────────────────────────────
 def today_str():
@@ -16,16 +25,6 @@ def today_str():
 def make_hash(title, link):
     return hashlib.md5((title + link).encode("utf-8")).hexdigest()
 
-def load_json(path):
-    if os.path.exists(path):
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def save_json(obj, path):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
-
 # ─── 뉴스 크롤러 ────────────────────────────────────────────
 def get_news(query):
     url = "https://openapi.naver.com/v1/search/news.json"
@@ -42,24 +41,51 @@ def get_news(query):
     except:
         return []
 
+def merge_news(existing, new_items):
+    seen = {make_hash(n["title"], n["link"]) for n in existing}
+    merged = list(existing)
+    for it in new_items:
+        h = make_hash(it["title"], it["link"])
+        if h not in seen:
+            merged.append(it)
+            seen.add(h)
+    return merged
+
 def crawl_today_news(keywords):
-    db = load_json(NEWS_DB_PATH)
     d = today_str()
-    db.setdefault(d, [])
-    seen = {make_hash(n["title"], n["link"]) for n in db[d]}
+    others = []
     for kw in keywords:
-        for it in get_news(kw):
-            h = make_hash(it["title"], it["link"])
-            if h not in seen:
-                db[d].append({
-                    "title": it["title"],
-                    "description": it["description"],
-                    "pubDate": it["pubDate"],
-                    "link": it["link"],
-                    "query": kw
-                })
-                seen.add(h)
-    save_json(db, NEWS_DB_PATH)
+        # 키워드별 리스를 잡은 쪽만 크롤링하고, CRAWL_TTL 동안은 아무도(자신 포함) 다시 크롤링하지 않는다
+        # (크롤링 중 예외가 나면 leader() 가 리스를 풀어 준다)
+        name, owner = f"crawl:{d}:{kw}", lease_owner()
+        with leader(state, name, ttl=CRAWL_TTL, owner=owner, release=False) as is_leader:
+            if not is_leader:
+                others.append(name)
+                continue
+            # 저장 전에 한 번만 정규화 → 해시/필터/프롬프트에서 다시 정제하지 않는다
+            fetched = [{
+                "title": it["title"],
+                "description": it["description"],
+                "pubDate": it["pubDate"],
+                "link": it["link"],
+                "query": kw,
+                "normalized": True
+            } for it in iter_normalized(get_news(kw))]
+            if not fetched:
+                # 가져온 게 없으면(API 실패 등) 리스를 풀어 다음 요청에서 다시 시도하게 한다
+                state.release_lease(name, owner)
+                continue
+            # 읽기-병합-쓰기를 원자적으로 처리해 다른 워커의 저장분을 덮어쓰지 않는다
+            state.update(f"news:{d}", lambda cur: merge_news(cur, fetched), default=[])
+            state.set(f"done:{name}", True)
+
+    # 다른 워커가 크롤링 중인 키워드는 저장이 끝날 때까지 잠깐 기다렸다가 읽는다
+    deadline = time.monotonic() + CRAWL_WAIT
+    for name in others:
+        wait_for_leader(state, name, f"done:{name}", timeout=max(0.0, deadline - time.monotonic()))
+
+# 예전 news_data.json 에 쌓인 뉴스를 공유 저장소로 한 번만 옮긴다 (정규화 포함)
+import_legacy_news(state, NEWS_DB_PATH, merge=merge_news, prepare=normalize_item)
 
 # ─── 투자자 성향 설문 & 분류 ─────────────────────────────────
 st.sidebar.header("📋 투자자 성향 설문")
@@ -84,33 +110,6 @@ kws = st.sidebar.multiselect(
     default=["금리","ETF"]
 )
 
-# 성향 분류 로직
-def classify_investor(answers):
-    cnt = {"안정":0, "균형":0, "고수익":0}
-    mapping = {
-        "절대 불가":"안정", "감수 가능":"균형", "고수익이면 감수":"고수익",
-        "안정":"안정",     "균형":"균형",     "고수익":"고수익"
-    }
-    for a in answers:
-        key = mapping.get(a)
-        if key: cnt[key] += 1
-
-    if cnt["고수익"] >= 4:
-        return "공격형 투자자", 0.7
-    elif cnt["안정"] >= 4:
-        return "안정형 투자자", 0.3
-    else:
-        return "중립형 투자자", 0.5
-
-def generate_investor_profile(label, risk_score, period_label, interests):
-    horizon_map = {"1년 이하":1, "1~5년":3, "5년 이상":5}
-    return {
-        "investor_label": label,
-        "risk_score": risk_score,
-        "horizon_years": horizon_map.get(period_label, 3),
-        "interest_tags": interests
-    }
-
 if st.sidebar.button("설문 완료 & 추천 시작"):
     answers = [q2, q3, q4, q5, q6]
     label, base_risk = classify_investor(answers)
@@ -129,12 +128,13 @@ if "profile" in st.session_state:
 
     # 1) 오늘 뉴스 크롤링
     crawl_today_news(kws)
-    news_db = load_json(NEWS_DB_PATH)
-    today   = max(news_db.keys())
-    items   = news_db[today][:50]  # 최대 50건까지 가져온 뒤 필터할 수 있게 조금 넉넉히
+    today   = today_str()
+    items   = news_cache.get(f"news:{today}", [])[:50]  # 최대 50건까지 가져온 뒤 필터할 수 있게 조금 넉넉히
 
     # 2) 뉴스 요약 & 태그 (관심 분야 필터링 적용)
     st.subheader("뉴스 요약 & 태그")
+    if controller.mode != "full":
+        st.caption(f"⚠️ 요청이 많아 간소화 모드({controller.mode})로 제공 중입니다.")
     tags_accum = []
     for it in items:
         cnt = it["title"] + "\n" + it["description"]
@@ -143,12 +143,10 @@ if "profile" in st.session_state:
         if prof["interest_tags"] and not any(tag in cnt for tag in prof["interest_tags"]):
             continue
 
-        summary = summarize_text(cnt)
-        if summary.startswith("❌"):
-            st.error(f"{it['title']}\n{summary}")
-            continue
+        # LLM 요약이 실패하면 컨트롤러가 캐시/잘라내기 요약으로 대신 답한다
+        summary = controller.summarize(cnt)
 
-        themes = classify_content(cnt).get("themes", [])
+        themes = controller.themes(cnt)
         tags_accum += themes
 
         with st.expander(it["title"]):
@@ -158,34 +156,18 @@ if "profile" in st.session_state:
 
     # 3) 테마 병합 후 추천
     market_themes = list(set(kws + tags_accum))
-    PRODUCTS_DB = [
-        {"name":"EMP 분산 펀드","risk":0.5,"themes":["자산배분","ETF"],"description":"여러 ETF 분산투자"},
-        {"name":"TDF 2045","risk":0.3,"themes":["장기","채권"],"description":"은퇴 타깃 리밸런싱"},
-        {"name":"글로벌 리츠","risk":0.4,"themes":["리츠","부동산"],"description":"안정적 부동산 배당"},
-        {"name":"고정쿠폰 ELS","risk":0.8,"themes":["구조화상품"],"description":"조기상환형 ELS"},
-        {"name":"Pre-IPO 펀드","risk":0.9,"themes":["프리IPO"],"description":"미상장 스타트업 투자"},
-        {"name":"인프라 ETF","risk":0.6,"themes":["인프라"],"description":"도로·데이터센터 투자"},
-        {"name":"AI 스마트베타","risk":0.6,"themes":["AI"],"description":"AI 팩터 기반 ETF"},
-    ]
-
-    def recommend_products(profile, themes):
-        scored=[]
-        for p in PRODUCTS_DB:
-            rs = 1 - abs(profile["risk_score"] - p["risk"])
-            ts = len(set(profile["interest_tags"] + themes) & set(p["themes"])) \
-                 / (len(p["themes"]) + 1e-5)
-            scored.append((0.6*rs + 0.4*ts, p))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [p for _, p in scored[:3]]
-
-    recs = recommend_products(prof, market_themes)
+    # 테마 뷰별 사전 계산 테이블에서 조회만 한다 (처음 보는 테마 조합이면 테마 점수만 다시 계산)
+    recs, breakdowns = recommendation_table.lookup_with_breakdown(prof, market_themes)
 
     # 4) 추천 상품 표시
     st.subheader("추천 상품")
-    for p in recs:
+    for p, b in zip(recs, breakdowns):
         st.markdown(f"### {p['name']} （위험도 {p['risk']}）")
         st.write(p["description"])
         st.write("테마:", ", ".join(p["themes"]))
+        st.caption(f"추천 근거 - 위험 적합 {b['risk_fit']:.2f} · "
+                   f"테마 {b['theme_overlap']:.2f} ({', '.join(b['matched_themes']) or '없음'}) · "
+                   f"기간 적합 {b['horizon_fit']:.2f}")
 
     # 5) 챗봇 Q&A
     st.subheader("챗봇 Q&A")
@@ -194,7 +176,8 @@ if "profile" in st.session_state:
         prompt = (
             f"사용자 프로필: {prof}\n"
             f"추천 상품: {[x['name'] for x in recs]}\n"
+            f"추천 근거:\n{format_breakdown(breakdowns)}\n"
             f"질문: {q}"
         )
-        answer = chat_completion(prompt)
+        answer = controller.chat(prompt, fallback=format_breakdown(breakdowns))
         st.info(answer)
@@ -1,10 +1,10 @@
 # hyperclova_api.py
 import os
 import requests
-from functools import lru_cache
 
 API_KEY = os.getenv("HCX_API_KEY")
 BASE_URL = "https://clovastudio.stream.ntruss.com"  # CLOVA Studio Chat Completions v3 엔드포인트
+CHAT_TIMEOUT = 10  # chat_completion 요청 타임아웃(초)
 
 def _get_headers():
     """
@@ -17,7 +17,6 @@ def _get_headers():
         "Content-Type": "application/json"
     }
 
-@lru_cache(maxsize=128)
 def classify_content(text: str) -> dict:
     """
     TODO: 실제 HyperCLOVA X 콘텐츠 분류 API 호출 부분으로 교체
@@ -34,7 +33,6 @@ def classify_content(text: str) -> dict:
     # return json.loads(message)
     return {"risk": "중립", "themes": [], "period": "중기"}
 
-@lru_cache(maxsize=128)
 def summarize_text(text: str, max_length: int = 200) -> str:
     """
     TODO: 실제 HyperCLOVA X 요약 API 호출 부분으로 교체
@@ -48,6 +46,12 @@ def summarize_text(text: str, max_length: int = 200) -> str:
     # r.raise_for_status()
     # data = r.json()
     # return data["result"]["choices"][0]["message"]["content"]
+    return truncate_summary(text, max_length)
+
+def truncate_summary(text: str, max_length: int = 200) -> str:
+    """
+    API 없이 앞부분만 잘라 쓰는 요약 대체 로직.
+    """
     return text[:max_length] + "..."
 
 def chat_completion(prompt: str) -> str:
@@ -69,7 +73,7 @@ def chat_completion(prompt: str) -> str:
         resp = requests.post(f"{BASE_URL}/v3/chat/completions",
                              headers=headers,
                              json=payload,
-                             timeout=10)
+                             timeout=CHAT_TIMEOUT)
         resp.raise_for_status()
     except requests.RequestException as e:
         # 네트워크 에러 또는 비정상 응답 시
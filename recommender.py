@@ -0,0 +1,294 @@
+# recommender.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import product as iter_product
+
+# ─── 설문 문항 ───────────────────────────────────────────────
+SURVEY_OPTIONS = {
+    "q1": ["1년 이하", "1~5년", "5년 이상"],
+    "q2": ["절대 불가", "감수 가능", "고수익이면 감수"],
+    "q3": ["안정", "균형", "고수익"],
+    "q4": ["예금·적금", "펀드 소액", "직접 주식"],
+    "q5": ["10% 이하", "10~30%", "30% 이상"],
+    "q6": ["3% 안정", "10% 수익/5% 손실", "20% 수익/손실"],
+}
+INTEREST_OPTIONS = ["인프라", "ETF", "TDF", "EMP", "프리IPO", "구조화상품", "AI"]
+
+# 미리 계산해 둘 관심 분야 조합 (선택 안 함 + 단일 선택 + 자주 쓰는 2개 조합)
+COMMON_INTEREST_SETS = (
+    [()]
+    + [(t,) for t in INTEREST_OPTIONS]
+    + [("ETF", "TDF"), ("ETF", "AI"), ("인프라", "ETF"), ("EMP", "ETF"), ("프리IPO", "AI")]
+)
+
+# ─── 상품 DB ─────────────────────────────────────────────────
+# horizon: 권장 투자 기간(년)
+PRODUCTS_DB = [
+    {"name":"EMP 분산 펀드","risk":0.5,"horizon":3,"themes":["자산배분","ETF"],"description":"여러 ETF 분산투자"},
+    {"name":"TDF 2045","risk":0.3,"horizon":5,"themes":["장기","채권"],"description":"은퇴 타깃 리밸런싱"},
+    {"name":"글로벌 리츠","risk":0.4,"horizon":3,"themes":["리츠","부동산"],"description":"안정적 부동산 배당"},
+    {"name":"고정쿠폰 ELS","risk":0.8,"horizon":3,"themes":["구조화상품"],"description":"조기상환형 ELS"},
+    {"name":"Pre-IPO 펀드","risk":0.9,"horizon":5,"themes":["프리IPO"],"description":"미상장 스타트업 투자"},
+    {"name":"인프라 ETF","risk":0.6,"horizon":5,"themes":["인프라"],"description":"도로·데이터센터 투자"},
+    {"name":"AI 스마트베타","risk":0.6,"horizon":3,"themes":["AI"],"description":"AI 팩터 기반 ETF"},
+]
+
+# ─── 성향 분류 & 프로필 ──────────────────────────────────────
+def classify_investor(answers):
+    cnt = {"안정":0, "균형":0, "고수익":0}
+    mapping = {
+        "절대 불가":"안정", "감수 가능":"균형", "고수익이면 감수":"고수익",
+        "안정":"안정",     "균형":"균형",     "고수익":"고수익"
+    }
+    for a in answers:
+        key = mapping.get(a)
+        if key: cnt[key] += 1
+
+    if cnt["고수익"] >= 4:
+        return "공격형 투자자", 0.7
+    elif cnt["안정"] >= 4:
+        return "안정형 투자자", 0.3
+    else:
+        return "중립형 투자자", 0.5
+
+def generate_investor_profile(label, risk_score, period_label, interests):
+    horizon_map = {"1년 이하":1, "1~5년":3, "5년 이상":5}
+    return {
+        "investor_label": label,
+        "risk_score": risk_score,
+        "horizon_years": horizon_map.get(period_label, 3),
+        "interest_tags": interests
+    }
+
+# ─── 점수 계산 & 추천 ────────────────────────────────────────
+W_RISK, W_THEME, W_HORIZON = 0.5, 0.3, 0.2
+HORIZON_SPAN = 4  # 설문 투자기간 1~5년 범위
+NEUTRAL_HORIZON_FIT = 0.5  # 투자기간 정보가 없는 상품은 가산도 감점도 하지 않는다
+
+@lru_cache(maxsize=1024)
+def _static_components(risk_score, horizon_years, p_risk, p_horizon):
+    """
+    (프로필 구간, 상품) 별로 테마와 무관한 점수(위험 적합도, 기간 적합도)를 캐시한다.
+    """
+    rs = 1 - abs(risk_score - p_risk)
+    if p_horizon is None:
+        hs = NEUTRAL_HORIZON_FIT
+    else:
+        hs = 1 - min(abs(horizon_years - p_horizon) / HORIZON_SPAN, 1)
+    return rs, hs
+
+def _theme_component(interest_tags, themes, p):
+    matched = sorted(set(interest_tags + themes) & set(p["themes"]))
+    return len(matched) / (len(p["themes"]) + 1e-5), matched
+
+def _total(rs, ts, hs):
+    return W_RISK*rs + W_THEME*ts + W_HORIZON*hs
+
+def score_breakdown(profile, themes, p):
+    """
+    상품 점수를 구성 요소별로 나눠서 돌려준다.
+    """
+    rs, hs = _static_components(profile["risk_score"], profile["horizon_years"],
+                                p["risk"], p.get("horizon"))
+    ts, matched = _theme_component(profile["interest_tags"], themes, p)
+    return {
+        "name": p["name"],
+        "score": _total(rs, ts, hs),
+        "risk_fit": rs,
+        "theme_overlap": ts,
+        "matched_themes": matched,
+        "horizon_fit": hs,
+    }
+
+def rescore_themes(breakdown, profile, themes, p):
+    """
+    테마만 바뀌었을 때: 캐시된 위험/기간 점수는 두고 테마 점수만 다시 계산한다.
+    """
+    ts, matched = _theme_component(profile["interest_tags"], themes, p)
+    return dict(breakdown, score=_total(breakdown["risk_fit"], ts, breakdown["horizon_fit"]),
+                theme_overlap=ts, matched_themes=matched)
+
+def score_product(profile, themes, p):
+    return score_breakdown(profile, themes, p)["score"]
+
+def rank_products(profile, themes, products=PRODUCTS_DB, top_k=3):
+    """
+    상위 top_k 상품의 점수 breakdown 목록 (점수 내림차순).
+    """
+    scored = [score_breakdown(profile, themes, p) for p in products]
+    scored.sort(key=lambda x: x["score"], reverse=True)
+    return scored[:top_k]
+
+def recommend_products(profile, themes, products=PRODUCTS_DB, top_k=3):
+    by_name = {p["name"]: p for p in products}
+    return [by_name[b["name"]] for b in rank_products(profile, themes, products, top_k)]
+
+def format_breakdown(breakdowns):
+    """
+    챗봇 프롬프트용 요약. 상품당 한 줄로 추천 근거를 담는다.
+    """
+    lines = []
+    for b in breakdowns:
+        matched = "/".join(b["matched_themes"]) or "-"
+        lines.append(f"{b['name']}: 총점 {b['score']:.2f} "
+                     f"(위험적합 {b['risk_fit']:.2f}, 테마 {b['theme_overlap']:.2f}[{matched}], "
+                     f"기간적합 {b['horizon_fit']:.2f})")
+    return "\n".join(lines)
+
+# ─── 추천 결과 사전 계산 테이블 ──────────────────────────────
+def profile_key(profile):
+    """
+    추천 결과에 영향을 주는 필드만 뽑아 조회용 키를 만든다.
+    """
+    return (
+        profile["investor_label"],
+        profile["risk_score"],
+        profile["horizon_years"],
+        tuple(sorted(set(profile["interest_tags"]))),
+    )
+
+def _product_fingerprint(p):
+    return hashlib.md5(json.dumps(p, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+class RecommendationTable:
+    """
+    모든 설문 응답 조합 × 주요 관심 분야 조합에 대해 top-k 추천을 미리 계산해 둔다.
+
+    세션마다 뉴스 키워드가 달라 시장 테마도 다르므로, 테이블은 테마 뷰(상품 테마와 겹치는
+    시장 테마)별 스냅샷으로 두고 최근 max_views 개만 LRU 로 유지한다.
+    새 테마 뷰는 가장 최근 스냅샷에서 테마 점수만 다시 계산해 만들고,
+    상품이 바뀌면 바뀐 상품만 다시 계산한다. 서빙 시에는 dict 조회만 한다.
+    """
+
+    def __init__(self, products=PRODUCTS_DB, interest_sets=COMMON_INTEREST_SETS, top_k=3, max_views=32):
+        self.top_k = top_k
+        self.max_views = max_views
+        self.interest_sets = [tuple(sorted(set(s))) for s in interest_sets]
+        self._lock = threading.Lock()
+        self._products = {}            # name → product
+        self._fingerprints = {}        # name → fingerprint
+        self._product_themes = frozenset()
+        self._views = OrderedDict()    # theme view → (scores, table)
+        self._bases = self._survey_bases()  # 설문 응답 조합이 만들 수 있는 (label, risk, horizon)
+        self.refresh([], products)
+
+    @staticmethod
+    def _survey_bases():
+        opts, bases = SURVEY_OPTIONS, set()
+        for combo in iter_product(*(opts[q] for q in ("q1", "q2", "q3", "q4", "q5", "q6"))):
+            label, risk = classify_investor(list(combo[1:]))
+            base = generate_investor_profile(label, risk, combo[0], [])
+            bases.add((label, risk, base["horizon_years"]))
+        return bases
+
+    def _profile_keys(self):
+        return [base + (tags,) for base in self._bases for tags in self.interest_sets]
+
+    def theme_view(self, market_themes):
+        # 점수에 영향을 주는 건 상품 테마와 겹치는 시장 테마뿐이다
+        return tuple(sorted(set(market_themes) & self._product_themes))
+
+    def _build_view(self, view, base=None, base_view=None, changed=()):
+        """
+        view 에 대한 (scores, table) 스냅샷을 만든다. base 스냅샷의 점수를 재사용해서
+        바뀐 상품은 전부, 테마 뷰가 다르면 테마 점수만 다시 계산한다. (_lock 을 잡은 상태에서 호출)
+        """
+        themes = list(view)
+        retheme = view != base_view
+        all_scores, table = {}, {}
+        for key in self._profile_keys():
+            label, risk, horizon, tags = key
+            profile = {"investor_label": label, "risk_score": risk,
+                       "horizon_years": horizon, "interest_tags": list(tags)}
+            prev = base.get(key, {}) if base else {}
+            scores = {}
+            for n, p in self._products.items():
+                if n in changed or n not in prev:
+                    scores[n] = score_breakdown(profile, themes, p)
+                elif retheme:
+                    # 위험/기간 점수는 그대로 두고 테마 점수만 갱신
+                    scores[n] = rescore_themes(prev[n], profile, themes, p)
+                else:
+                    scores[n] = prev[n]
+            # 동점일 때 rank_products 와 같은 순서가 되도록 상품 DB 순서로 정렬
+            ranked = sorted(self._products, key=lambda n: scores[n]["score"], reverse=True)
+            all_scores[key] = scores
+            table[key] = [scores[n] for n in ranked[:self.top_k]]
+        return all_scores, table
+
+    def _latest(self):
+        # _lock 을 잡은 상태에서 호출
+        if not self._views:
+            return None, None
+        view = next(reversed(self._views))
+        return self._views[view][0], view
+
+    def _ensure_view(self, view):
+        # _lock 을 잡은 상태에서 호출
+        snap = self._views.get(view)
+        if snap is not None:
+            self._views.move_to_end(view)
+            return snap
+        base, base_view = self._latest()
+        snap = self._views[view] = self._build_view(view, base, base_view)
+        while len(self._views) > self.max_views:
+            self._views.popitem(last=False)
+        return snap
+
+    def refresh(self, market_themes, products=None):
+        """
+        상품 DB 가 바뀌었으면 바뀐 상품만 다시 계산하고, market_themes 의 테마 뷰 스냅샷을 준비한다.
+        테마 뷰를 돌려준다.
+        """
+        with self._lock:
+            if products is not None:
+                new_fps = {p["name"]: _product_fingerprint(p) for p in products}
+                changed = {n for n, fp in new_fps.items() if self._fingerprints.get(n) != fp}
+                removed = set(self._fingerprints) - set(new_fps)
+                if changed or removed:
+                    base, base_view = self._latest()
+                    self._products = {p["name"]: p for p in products}
+                    self._fingerprints = new_fps
+                    self._product_themes = frozenset(t for p in products for t in p["themes"])
+                    # 상품 테마가 바뀌면 기존 테마 뷰 키가 달라질 수 있으므로 스냅샷을 비우고 새로 만든다
+                    self._views.clear()
+                    view = self.theme_view(market_themes)
+                    self._views[view] = self._build_view(view, base, base_view, changed)
+                    return view
+            view = self.theme_view(market_themes)
+            self._ensure_view(view)
+            return view
+
+    def _lookup(self, profile, market_themes):
+        with self._lock:
+            view = self.theme_view(market_themes)
+            _, table = self._ensure_view(view)
+            products = self._products
+        recs = table.get(profile_key(profile))
+        if recs is None:
+            recs = rank_products(profile, list(view), list(products.values()), self.top_k)
+        return recs, products
+
+    def lookup_with_breakdown(self, profile, market_themes):
+        """
+        사전 계산된 추천 상품 목록과 각 상품의 점수 breakdown 을 같은 스냅샷에서 꺼내 함께 돌려준다.
+        테이블에 없는 관심 분야 조합이면 즉석에서 계산한다.
+        """
+        recs, products = self._lookup(profile, market_themes)
+        return [products[b["name"]] for b in recs], recs
+
+    def lookup(self, profile, market_themes):
+        """
+        사전 계산된 추천 상품 목록을 돌려준다.
+        """
+        return self.lookup_with_breakdown(profile, market_themes)[0]
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(table) for _, table in self._views.values())
+
+# 프로세스 전역 테이블 (앱에서 공유)
+recommendation_table = RecommendationTable()
@@ -0,0 +1,332 @@
+# shared_state.py
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "sqlite")   # sqlite | file
+STATE_PATH    = os.getenv("STATE_PATH", "shared_state.db")
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def lease_owner():
+    """
+    리스 소유자 토큰. 같은 워커의 세션끼리도 서로 다른 값이라 남의 리스를 풀지 않는다.
+    """
+    return f"{worker_id()}:{uuid.uuid4().hex}"
+
+# ─── 백엔드 인터페이스 ───────────────────────────────────────
+class StateBackend:
+    """
+    여러 워커가 공유하는 key-value 저장소.
+    모든 쓰기는 key 의 version 을 1 올리고, 다른 워커는 version 비교로 로컬 캐시를 무효화한다.
+
+    Redis 호환 구현은 다음과 같이 대응하면 된다.
+      get/set          → GET / SET + INCR "<key>:v" (MULTI)
+      update           → WATCH key → GET → MULTI SET + INCR → EXEC (충돌 시 재시도)
+      version          → GET "<key>:v"
+      keys             → SCAN MATCH "<prefix>*"
+      acquire_lease    → SET lease:<name> owner NX PX ttl
+      release_lease    → 소유자 확인 후 DEL (Lua 스크립트)
+      lease_active     → EXISTS lease:<name>
+    """
+
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def update(self, key, fn, default=None):
+        """
+        fn(현재값) 의 결과를 원자적으로 저장하고 돌려준다.
+        """
+        raise NotImplementedError
+
+    def version(self, key):
+        raise NotImplementedError
+
+    def keys(self, prefix=""):
+        raise NotImplementedError
+
+    def acquire_lease(self, name, owner, ttl):
+        """
+        만료되지 않은 리스가 없을 때만 owner 에게 주고 True 를 돌려준다.
+        현재 소유자가 다시 요청해도 만료 전에는 거절한다.
+        """
+        raise NotImplementedError
+
+    def release_lease(self, name, owner):
+        raise NotImplementedError
+
+    def lease_active(self, name):
+        """
+        누구든 만료되지 않은 리스를 갖고 있으면 True.
+        """
+        raise NotImplementedError
+
+# ─── 파일 락 백엔드 (단일 호스트) ────────────────────────────
+class FileLockBackend(StateBackend):
+    """
+    값은 JSON 파일(path)에, version 과 리스는 작은 메타 파일(path.meta)에 두고 flock 으로 읽기-수정-쓰기를 직렬화한다.
+    version()/리스 확인은 메타 파일만 읽으므로 값이 커져도 SharedCache 의 확인 비용이 늘지 않는다.
+    쓰기는 임시 파일 + os.replace 로 교체해서 중간에 죽어도 파일이 깨지지 않는다.
+    """
+
+    def __init__(self, path="shared_state.json"):
+        self.path      = path
+        self.meta_path = path + ".meta"
+        self.lock_path = path + ".lock"
+
+    @contextmanager
+    def _locked(self, exclusive):
+        import fcntl   # POSIX 전용이라 이 백엔드를 쓸 때만 불러온다
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _load(path, default):
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        return default
+
+    @staticmethod
+    def _dump(path, doc):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _read_kv(self):
+        return self._load(self.path, {})
+
+    def _read_meta(self):
+        return self._load(self.meta_path, {"versions": {}, "leases": {}})
+
+    def get(self, key, default=None):
+        with self._locked(False):
+            return self._read_kv().get(key, default)
+
+    def set(self, key, value):
+        self.update(key, lambda _: value)
+
+    def update(self, key, fn, default=None):
+        with self._locked(True):
+            kv, meta = self._read_kv(), self._read_meta()
+            value = fn(kv.get(key, default))
+            kv[key] = value
+            meta["versions"][key] = meta["versions"].get(key, 0) + 1
+            # 값을 먼저 바꾸고 version 을 올린다 (version 이 바뀌었으면 새 값이 이미 보인다)
+            self._dump(self.path, kv)
+            self._dump(self.meta_path, meta)
+            return value
+
+    def version(self, key):
+        with self._locked(False):
+            return self._read_meta()["versions"].get(key, 0)
+
+    def keys(self, prefix=""):
+        with self._locked(False):
+            return sorted(k for k in self._read_kv() if k.startswith(prefix))
+
+    def acquire_lease(self, name, owner, ttl):
+        with self._locked(True):
+            meta = self._read_meta()
+            now = time.time()
+            holder = meta["leases"].get(name)
+            if holder and holder["expires"] > now:
+                return False
+            meta["leases"][name] = {"owner": owner, "expires": now + ttl}
+            self._dump(self.meta_path, meta)
+            return True
+
+    def release_lease(self, name, owner):
+        with self._locked(True):
+            meta = self._read_meta()
+            if meta["leases"].get(name, {}).get("owner") == owner:
+                del meta["leases"][name]
+                self._dump(self.meta_path, meta)
+
+    def lease_active(self, name):
+        with self._locked(False):
+            holder = self._read_meta()["leases"].get(name)
+            return bool(holder) and holder["expires"] > time.time()
+
+# ─── SQLite WAL 백엔드 (단일 호스트, 다중 프로세스) ──────────
+class SQLiteBackend(StateBackend):
+    """
+    WAL 모드 SQLite. 읽기는 쓰기와 동시에 진행되고, 쓰기는 BEGIN IMMEDIATE 로 직렬화된다.
+    트랜잭션이 섞이지 않도록 연결은 스레드마다 따로 연다 (fork 된 자식 프로세스도 새로 연다).
+    """
+
+    def __init__(self, path="shared_state.db", timeout=30.0):
+        self.path    = path
+        self.timeout = timeout
+        self._local  = threading.local()
+
+    def _db(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS kv "
+                         "(key TEXT PRIMARY KEY, value TEXT, version INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases "
+                         "(name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)")
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    @contextmanager
+    def _write_tx(self):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        else:
+            db.execute("COMMIT")
+
+    def get(self, key, default=None):
+        row = self._db().execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key, value):
+        self.update(key, lambda _: value)
+
+    def update(self, key, fn, default=None):
+        with self._write_tx() as db:
+            row = db.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            value = fn(json.loads(row[0]) if row else default)
+            db.execute("INSERT INTO kv (key, value, version) VALUES (?, ?, 1) "
+                       "ON CONFLICT(key) DO UPDATE SET value = excluded.value, version = version + 1",
+                       (key, json.dumps(value, ensure_ascii=False)))
+            return value
+
+    def version(self, key):
+        row = self._db().execute("SELECT version FROM kv WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def keys(self, prefix=""):
+        rows = self._db().execute("SELECT key FROM kv WHERE substr(key, 1, ?) = ? ORDER BY key",
+                                  (len(prefix), prefix)).fetchall()
+        return [r[0] for r in rows]
+
+    def acquire_lease(self, name, owner, ttl):
+        now = time.time()
+        with self._write_tx() as db:
+            row = db.execute("SELECT expires FROM leases WHERE name = ?", (name,)).fetchone()
+            if row and row[0] > now:
+                return False
+            db.execute("INSERT OR REPLACE INTO leases (name, owner, expires) VALUES (?, ?, ?)",
+                       (name, owner, now + ttl))
+            return True
+
+    def release_lease(self, name, owner):
+        with self._write_tx() as db:
+            db.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    def lease_active(self, name):
+        row = self._db().execute("SELECT expires FROM leases WHERE name = ?", (name,)).fetchone()
+        return bool(row) and row[0] > time.time()
+
+def get_backend(kind=STATE_BACKEND, path=STATE_PATH):
+    if kind == "sqlite":
+        return SQLiteBackend(path)
+    if kind == "file":
+        return FileLockBackend(path)
+    raise ValueError(f"알 수 없는 STATE_BACKEND: {kind}")
+
+# ─── 리더 선출 & 워커 간 캐시 무효화 ─────────────────────────
+@contextmanager
+def leader(backend, name, ttl, owner=None, release=True):
+    """
+    리스를 잡은 쪽만 True 를 받는다. 나머지는 (리스를 가졌던 워커 자신도) False 를 받고 작업을 건너뛴다.
+    release=False 이면 작업 후에도 ttl 동안 리스를 유지해 같은 작업의 반복을 막는다.
+    작업 중 예외가 나면 release 와 상관없이 리스를 풀어 다른 워커가 바로 다시 시도할 수 있게 한다.
+    """
+    owner = owner or lease_owner()
+    acquired = backend.acquire_lease(name, owner, ttl)
+    try:
+        yield acquired
+    except BaseException:
+        if acquired:
+            backend.release_lease(name, owner)
+        raise
+    else:
+        if acquired and release:
+            backend.release_lease(name, owner)
+
+def wait_for_leader(backend, name, done_key, timeout, interval=0.05):
+    """
+    다른 워커가 리스 name 을 잡고 하는 작업을 최대 timeout 초 기다린다.
+    done_key 가 한 번이라도 쓰였거나(작업 완료) 리스가 사라지면(실패·포기·만료) True,
+    시간 안에 둘 다 아니면 False 를 돌려준다.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if backend.version(done_key) or not backend.lease_active(name):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+class SharedCache:
+    """
+    공유 저장소 값을 프로세스 로컬에 캐시한다.
+    다른 워커가 key 를 갱신하면 version 이 달라지므로 다음 조회 때 다시 읽는다.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._local  = {}   # key → (version, value)
+
+    def get(self, key, default=None):
+        v = self.backend.version(key)
+        cached = self._local.get(key)
+        if cached and cached[0] == v:
+            return cached[1]
+        value = self.backend.get(key, default)
+        self._local[key] = (v, value)
+        return value
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._local.clear()
+        else:
+            self._local.pop(key, None)
+
+# ─── 기존 news_data.json 가져오기 ────────────────────────────
+def import_legacy_news(backend, path, merge, prepare=None, prefix="news:"):
+    """
+    예전 {날짜: [항목, ...]} JSON 파일을 <prefix><날짜> 키로 한 번만 옮긴다.
+    merge(기존, 새 항목) 로 합치고, prepare 가 있으면 항목마다 먼저 적용한다.
+    옮긴 항목 수를 돌려준다 (이미 옮겼거나 파일이 없으면 0).
+    """
+    marker = f"migrated:{os.path.abspath(path)}"
+    if not os.path.exists(path) or backend.get(marker):
+        return 0
+    with leader(backend, marker, ttl=60) as is_leader:
+        if not is_leader or backend.get(marker):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            legacy = json.load(f)
+        count = 0
+        for d, items in legacy.items():
+            items = [prepare(it) for it in items] if prepare else items
+            backend.update(prefix + d, lambda cur, items=items: merge(cur, items), default=[])
+            count += len(items)
+        backend.set(marker, True)
+        return count
@@ -0,0 +1,150 @@
+# test_degradation.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from degradation import DegradationController, _percentile, cache_key, keyword_themes
+from shared_state import get_backend
+from hyperclova_api import CHAT_TIMEOUT
+
+SUMMARY_DEADLINE = 0.2
+
+# 정상 부하(clients)에서는 대기 호출 수가 max_pending 을 넘지 않도록 잡는다
+def simulate_load(controller=None, duration=6.0, clients=16, think_time=0.02,
+                  slow_latency=1.0, fast_latency=0.01, slow_window=(1.0, 3.0)):
+    """
+    가짜 LLM 으로 부하를 걸어 요청별 처리시간을 측정한다.
+    slow_window(초) 동안만 LLM 이 느려졌다가 다시 회복된다.
+    """
+    t0 = time.monotonic()
+
+    def fake_llm(text, max_length=200):
+        elapsed = time.monotonic() - t0
+        slow = slow_window[0] <= elapsed < slow_window[1]
+        time.sleep(slow_latency if slow else fast_latency)
+        return text[:50]
+
+    def client(c):
+        latencies, i = [], 0
+        while time.monotonic() - t0 < duration:
+            # 요청마다 다른 기사라서 캐시 적중 없이 LLM 지연이 그대로 드러난다
+            text = f"뉴스 {c}-{i} 금리 ETF 인프라 관련 기사 본문"
+            start = time.monotonic()
+            if controller is None:
+                fake_llm(text)
+            else:
+                controller.summarize(text, llm=fake_llm)
+            latencies.append(time.monotonic() - start)
+            time.sleep(think_time)
+            i += 1
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        return [x for res in pool.map(client, range(clients)) for x in res]
+
+def _controller(**kwargs):
+    params = dict(deadlines={"summary": SUMMARY_DEADLINE}, high_latency=0.15, low_latency=0.05,
+                  max_pending=24, llm_workers=16, window=20, cooldown=0.2, probe_interval=0.3)
+    params.update(kwargs)
+    return DegradationController(**params)
+
+def test_p99_bounded_and_recovers_under_slow_llm():
+    unguarded = simulate_load(duration=4.0)
+    ctl = _controller()
+    # 두 단계를 되돌아오려면 단계마다 빠른 프로브 표본과 cooldown 이 필요하므로 회복 구간을 넉넉히 둔다
+    guarded = simulate_load(ctl, duration=8.0)
+
+    # 컨트롤러 없이는 느린 구간의 지연이 그대로 꼬리 지연이 된다
+    assert _percentile(unguarded, 0.99) >= 0.9
+    # 컨트롤러가 있으면 요약 deadline 안에서 응답한다 (스케줄링 여유 50ms)
+    assert _percentile(guarded, 0.99) <= SUMMARY_DEADLINE + 0.05
+    # 느린 구간 동안 실제로 저하 모드를 거쳤다가 다시 full 로 돌아온다
+    assert ctl.mode_counts["truncate"] + ctl.mode_counts["cached"] > 0
+    assert ctl.mode == "full"
+    # 누적 집계는 최근 기록(served) 길이와 무관하게 전체 요청 수와 같다
+    assert sum(ctl.via_counts.values()) == len(guarded)
+    assert sum(ctl.mode_counts.values()) == len(guarded)
+
+def test_chat_deadline_outlasts_summary_deadline():
+    ctl = _controller()
+    assert ctl.deadlines["chat"] >= CHAT_TIMEOUT
+
+    def slow_chat(prompt):
+        time.sleep(SUMMARY_DEADLINE * 3)
+        return "정상 답변"
+
+    # 요약 deadline 보다 오래 걸려도 정상 범위의 챗봇 응답은 버리지 않는다
+    assert ctl.chat("질문", fallback="근거", llm=slow_chat) == "정상 답변"
+
+def test_local_summary_cache_is_bounded_lru():
+    ctl = _controller(max_cached=2)
+    for text in ("a", "b", "a", "c"):
+        ctl.summarize(text, llm=lambda t, n: t.upper())
+    time.sleep(0.05)  # 캐시 저장은 LLM 스레드의 완료 콜백에서 일어난다
+    assert [ctl.store.get(cache_key("summary", t, 200)) for t in "abc"] == ["A", None, "C"]
+    assert ctl.via_counts == {"llm": 3, "cache": 1}
+
+def test_summary_cache_writes_from_many_threads():
+    ctl = _controller(max_cached=50)
+    threads = [threading.Thread(target=lambda i=i: [ctl.summarize(f"뉴스 {i}-{j}", llm=lambda t, n: t.upper())
+                                                    for j in range(50)])
+               for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    time.sleep(0.05)
+    assert len(ctl.store) == 50
+
+def test_workers_share_llm_results_by_normalized_text(tmp_path):
+    path = str(tmp_path / "state.db")
+    calls = []
+
+    def summarize(text, max_length):
+        calls.append(text)
+        return "요약"
+
+    def classify(text):
+        calls.append(text)
+        return {"themes": ["ETF"]}
+
+    first, second = (_controller(store=get_backend("sqlite", path)) for _ in range(2))
+    assert first.summarize("금리 &amp; ETF  동향", llm=summarize) == "요약"
+    assert first.themes("금리 &amp; ETF  동향", llm=classify) == ["ETF"]
+    time.sleep(0.05)
+    # 다른 워커에서, 공백·엔티티만 다른 같은 기사는 LLM 을 다시 부르지 않는다
+    assert second.summarize("금리 & ETF 동향", llm=summarize) == "요약"
+    assert second.themes("금리 & ETF 동향", llm=classify) == ["ETF"]
+    assert len(calls) == 2
+    assert second.via_counts == {"cache": 2}
+    # 요약 길이가 다르면 다른 결과로 본다
+    second.summarize("금리 & ETF 동향", max_length=50, llm=summarize)
+    assert len(calls) == 3
+
+def test_summary_passes_max_length_to_llm():
+    ctl = _controller()
+    assert ctl.summarize("금리 인하 기대감", max_length=4, llm=lambda t, n: t[:n]) == "금리 인"
+
+def _failing_llm(*args):
+    return 1 / 0
+
+def test_llm_exceptions_fall_back_and_step_down():
+    ctl = _controller(cooldown=0.0, window=5)
+    text = "금리 인하로 ETF 자금 유입"
+    assert ctl.summarize(text, max_length=5, llm=_failing_llm) == "금리 인하..."
+    assert ctl.themes(text, llm=_failing_llm) == keyword_themes(text)
+    assert ctl.chat("질문", fallback="근거", llm=_failing_llm).endswith("근거")
+    assert ctl.mode != "full"
+    assert ctl.via_counts == {"truncate": 1, "keyword": 1, "canned": 1}
+
+def test_error_strings_are_failures():
+    ctl = _controller(cooldown=0.0, window=5)
+    error_chat = lambda prompt: "[Error] HyperCLOVA 호출 실패: timeout"
+    answer = ctl.chat("질문", fallback="근거", llm=error_chat)
+    assert not answer.startswith("[Error]") and answer.endswith("근거")
+    # 실패한 요약은 캐시하지 않는다
+    summary = ctl.summarize("환율 급등", llm=lambda t, n: "❌ 요약 실패")
+    assert summary == "환율 급등..."
+    time.sleep(0.05)
+    assert ctl.store.get(cache_key("summary", "환율 급등", 200)) is None
+    assert ctl.mode != "full"
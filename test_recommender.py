@@ -0,0 +1,80 @@
+# test_recommender.py
+import threading
+
+import recommender as r
+
+def _profile(key):
+    label, risk, horizon, tags = key
+    return {"investor_label": label, "risk_score": risk,
+            "horizon_years": horizon, "interest_tags": list(tags)}
+
+def _assert_matches_live(table, themes, products):
+    _, snapshot = table._views[table.refresh(themes)]
+    for key in snapshot:
+        prof = _profile(key)
+        recs, breakdowns = table.lookup_with_breakdown(prof, themes)
+        assert breakdowns == r.rank_products(prof, themes, products)
+        assert recs == r.recommend_products(prof, themes, products)
+        assert [p["name"] for p in recs] == [b["name"] for b in breakdowns]
+
+def test_lookup_before_refresh_is_built():
+    table = r.RecommendationTable()
+    prof = _profile(("중립형 투자자", 0.5, 3, ()))
+    assert table.lookup(prof, []) == r.recommend_products(prof, [])
+
+def test_table_matches_live_scoring_across_theme_and_product_changes():
+    table = r.RecommendationTable()
+    for themes in (["금리", "ETF", "AI"], ["리츠", "인프라"], ["금리", "ETF", "AI"]):
+        table.refresh(themes)
+        _assert_matches_live(table, themes, r.PRODUCTS_DB)
+
+    products = [dict(p) for p in r.PRODUCTS_DB]
+    products[0]["risk"] = 0.9
+    del products[3]
+    table.refresh(["리츠"], products)
+    _assert_matches_live(table, ["리츠"], products)
+    _assert_matches_live(table, ["AI"], products)
+
+def test_uncommon_interest_set_falls_back_to_live_scoring():
+    table = r.RecommendationTable()
+    prof = _profile(("중립형 투자자", 0.5, 5, ("AI", "TDF", "EMP")))
+    assert table.lookup(prof, ["AI"]) == r.recommend_products(prof, ["AI"])
+
+def test_sessions_with_different_themes_do_not_interfere():
+    table = r.RecommendationTable()
+    prof = _profile(("중립형 투자자", 0.5, 3, ()))
+    sessions = [["인프라"], ["구조화상품", "프리IPO"]]
+    expected = {tuple(t): r.recommend_products(prof, t) for t in sessions}
+    assert expected[("인프라",)] != expected[("구조화상품", "프리IPO")]
+    wrong = []
+
+    def session(themes):
+        for _ in range(300):
+            table.refresh(themes)
+            if table.lookup(prof, themes) != expected[tuple(themes)]:
+                wrong.append(themes)
+
+    threads = [threading.Thread(target=session, args=(t,)) for t in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not wrong
+    assert len(table._views) == 3  # [] + 세션별 테마 뷰 2개
+
+def test_views_are_bounded_lru():
+    table = r.RecommendationTable(max_views=2)
+    for themes in (["AI"], ["ETF"], ["인프라"]):
+        table.refresh(themes)
+    assert list(table._views) == [("ETF",), ("인프라",)]
+
+def test_product_without_horizon_gets_neutral_fit():
+    p = {"name": "기간 미정 상품", "risk": 0.5, "themes": ["AI"]}
+    for horizon in (1, 3, 5):
+        prof = _profile(("중립형 투자자", 0.5, horizon, ()))
+        assert r.score_breakdown(prof, [], p)["horizon_fit"] == r.NEUTRAL_HORIZON_FIT
+    # 기간이 맞는 상품보다는 낮고, 완전히 어긋난 상품보다는 높다
+    prof = _profile(("중립형 투자자", 0.5, 1, ()))
+    fit = r.score_breakdown(prof, [], dict(p, horizon=1))["score"]
+    miss = r.score_breakdown(prof, [], dict(p, horizon=5))["score"]
+    assert miss < r.score_breakdown(prof, [], p)["score"] < fit
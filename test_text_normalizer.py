@@ -0,0 +1,75 @@
+# test_text_normalizer.py
+import unicodedata
+
+import pytest
+
+import text_normalizer
+from text_normalizer import normalize_text, normalize_item, iter_normalized, normalize_batch, backfill_news_db
+
+@pytest.mark.parametrize("raw, expected", [
+    ("&quot;금리&quot; &amp; 환율", '"금리" & 환율'),
+    ("it&#39;s", "it's"),
+    ("&lt;속보&gt; 코스피", "<속보> 코스피"),
+    ("반도체&nbsp;수출", "반도체 수출"),
+    ("전망은&hellip;", "전망은…"),
+    ("<b>ETF</b> 자금 <i>유입</i>", "ETF 자금 유입"),
+])
+def test_normalize_text_decodes_entities_and_strips_tags(raw, expected):
+    assert normalize_text(raw) == expected
+
+def test_normalize_text_composes_hangul():
+    decomposed = unicodedata.normalize("NFD", "금리 인하")
+    assert decomposed != "금리 인하"
+    assert normalize_text(decomposed) == "금리 인하"
+
+def test_normalize_text_collapses_whitespace():
+    assert normalize_text("  금리\n\t 인하 \r\n 기대  ") == "금리 인하 기대"
+
+@pytest.mark.parametrize("raw", ["", None])
+def test_normalize_text_empty(raw):
+    assert normalize_text(raw) == ""
+
+def test_iter_normalized_is_lazy():
+    pulled = []
+
+    def source():
+        for i in range(3):
+            pulled.append(i)
+            yield {"title": f"<b>뉴스 {i}</b>"}
+        raise AssertionError("끝까지 읽으면 안 된다")
+
+    stream = iter_normalized(source())
+    assert pulled == []
+    assert next(stream)["title"] == "뉴스 0"
+    assert pulled == [0]
+
+def test_normalize_batch_with_workers_matches_serial():
+    items = [{"title": f"<b>뉴스&nbsp;{i}</b>", "description": "a &amp; b", "link": f"l{i}"}
+             for i in range(200)]
+    assert normalize_batch(items, workers=2, chunksize=16) == [normalize_item(it) for it in items]
+
+def test_normalize_batch_skips_pool_when_already_normalized(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("이미 정규화된 항목에는 프로세스 풀을 띄우지 않는다")
+
+    monkeypatch.setattr(text_normalizer, "ProcessPoolExecutor", no_pool)
+    items = [normalize_item({"title": "<b>뉴스</b>"}), normalize_item({"title": "공시"})]
+    assert normalize_batch(items, workers=2) == items
+
+def test_backfill_news_db_dedupes_within_each_date():
+    db = {
+        "2025-01-01": [
+            {"title": "<b>금리</b> 동결", "link": "a"},
+            {"title": "금리 동결", "link": "a"},
+            {"title": "환율 &amp; 수출", "link": "b"},
+        ],
+        "2025-01-02": [
+            {"title": "금리&nbsp;동결", "link": "a"},
+            {"title": "금리 동결", "link": "a"},
+        ],
+    }
+    out = backfill_news_db(db, workers=2)
+    assert [(it["title"], it["link"]) for it in out["2025-01-01"]] == [("금리 동결", "a"), ("환율 & 수출", "b")]
+    # 날짜별 키마다 따로 중복을 없애므로 같은 기사가 다른 날짜에는 남는다
+    assert [(it["title"], it["link"]) for it in out["2025-01-02"]] == [("금리 동결", "a")]
+    assert all(it["normalized"] for items in out.values() for it in items)
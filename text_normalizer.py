@@ -0,0 +1,108 @@
+# text_normalizer.py
+import html
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+# ─── 정규식 (모듈 로드 시 1회 컴파일) ─────────────────────────
+TAG_RE        = re.compile(r"<[^>]+>")
+WHITESPACE_RE = re.compile(r"\s+")
+
+TEXT_FIELDS = ("title", "description")
+
+def normalize_text(text):
+    """
+    HTML 태그 제거 → 엔티티 디코딩 → 유니코드 NFC 정규화 → 공백 정리.
+    """
+    if not text:
+        return ""
+    text = TAG_RE.sub("", text)
+    text = html.unescape(text)
+    text = unicodedata.normalize("NFC", text)
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+def normalize_item(item):
+    """
+    뉴스 항목의 텍스트 필드를 정규화한다. 이미 정규화된 항목은 그대로 돌려준다.
+    """
+    if item.get("normalized"):
+        return item
+    out = dict(item)
+    for field in TEXT_FIELDS:
+        if field in out:
+            out[field] = normalize_text(out[field])
+    out["normalized"] = True
+    return out
+
+def iter_normalized(items):
+    """
+    크롤링 결과를 한 건씩 정규화하며 흘려보내는 제너레이터.
+    """
+    for item in items:
+        yield normalize_item(item)
+
+def normalize_batch(items, workers=None, chunksize=64):
+    """
+    백필용 배치 모드: 프로세스 풀에 나눠서 정규화한다.
+    """
+    items = list(items)
+    if all(it.get("normalized") for it in items):
+        return items
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(normalize_item, items, chunksize=chunksize))
+
+def _dedupe(items):
+    # 정규화 후 제목+링크가 같아진 항목은 하나만 남긴다
+    seen, rows = set(), []
+    for it in items:
+        key = (it.get("title", ""), it.get("link", ""))
+        if key not in seen:
+            seen.add(key)
+            rows.append(it)
+    return rows
+
+def backfill_news_db(news_db, workers=None):
+    """
+    저장된 뉴스 DB({날짜: [항목, ...]})의 모든 항목을 정규화하고,
+    정규화 후 제목+링크가 같아진 중복은 하나만 남긴다.
+    """
+    dates = list(news_db)
+    flat  = [it for d in dates for it in news_db[d]]
+    normalized = iter(normalize_batch(flat, workers=workers))
+    return {d: _dedupe([next(normalized) for _ in news_db[d]]) for d in dates}
+
+def backfill_state(backend, prefix="news:", workers=None):
+    """
+    공유 저장소(shared_state)의 <prefix>* 키에 저장된 뉴스를 정규화한다.
+    정규화는 프로세스 풀에서 미리 해 두고, 저장은 update() 로 원자적으로 교체해서
+    그 사이 다른 워커가 추가한 항목도 잃지 않는다. 처리한 키 수를 돌려준다.
+    """
+    keys = backend.keys(prefix)
+    for key in keys:
+        snapshot = backend.get(key, [])
+        done = {(it.get("title", ""), it.get("link", "")): n
+                for it, n in zip(snapshot, normalize_batch(snapshot, workers=workers))}
+
+        def apply(cur):
+            return _dedupe([done.get((it.get("title", ""), it.get("link", ""))) or normalize_item(it)
+                            for it in cur])
+
+        backend.update(key, apply, default=[])
+    return len(keys)
+
+if __name__ == "__main__":
+    import json, sys
+    if len(sys.argv) > 1:
+        # 예전 단일 JSON 파일을 그 자리에서 정규화
+        path = sys.argv[1]
+        with open(path, encoding="utf-8") as f:
+            db = json.load(f)
+        db = backfill_news_db(db)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(db, f, ensure_ascii=False, indent=2)
+        print(f"✅ {path} 정규화 완료 ({sum(len(v) for v in db.values())}건)")
+    else:
+        # 앱이 실제로 읽는 공유 저장소 (STATE_BACKEND / STATE_PATH)
+        from shared_state import get_backend
+        n = backfill_state(get_backend())
+        print(f"✅ 공유 저장소 뉴스 {n}개 날짜 정규화 완료")